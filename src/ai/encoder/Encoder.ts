@@ -56,38 +56,55 @@ export function augment<TState1, TState2>(getter: (args: TState1) => TState2,
 export function concat<TState>(...encoders: Encoder<TState>[]):
     Encoder<TState>
 {
-    const size = encoders.reduce((a, b) => a + b.size, 0)
+    // precompute where each encoder's slice of the array starts
+    const offsets: number[] = [];
+    let size = 0;
+    for (const encoder of encoders)
+    {
+        offsets.push(size);
+        size += encoder.size;
+    }
     return {
         encode(arr, args)
         {
-            checkLength(arr, size);
-            let nextByteOffset = arr.byteOffset;
-            const maxByteOffset = arr.byteLength + arr.byteOffset;
-            for (const encoder of encoders)
+            if (arr.length !== size)
             {
-                const byteOffset = nextByteOffset;
-                nextByteOffset += encoder.size * arr.BYTES_PER_ELEMENT;
-                if (nextByteOffset > maxByteOffset)
-                {
-                    throw new Error("concat() encoder array was too small " +
-                        `for the given encoders (${arr.byteLength} bytes vs ` +
-                        `at least ${nextByteOffset - arr.byteOffset})`);
-                }
-                const a = new Float32Array(arr.buffer, byteOffset,
-                    encoder.size);
-                encoder.encode(a, args);
+                throw new Error("concat() encoder didn't fill the given " +
+                    `array (filled ${size} numbers, given ${arr.length})`);
             }
-            if (nextByteOffset !== maxByteOffset)
+            for (let i = 0; i < encoders.length; ++i)
             {
-                throw new Error("concat() encoder didn't fill the given " +
-                    `array (filled ${nextByteOffset - arr.byteOffset} bytes, ` +
-                    `given ${arr.byteLength})`);
+                const encoder = encoders[i];
+                encoder.encode(
+                    arr.subarray(offsets[i], offsets[i] + encoder.size), args);
             }
         },
         size
     };
 }
 
+/**
+ * Creates an Encoder that caches the output of an Encoder for a constant input,
+ * so it only has to be copied into the array on each call rather than
+ * recomputed.
+ * @param encoder Encoder to cache. Called once immediately.
+ * @param state Constant input for the Encoder.
+ */
+export function constant<TState>(encoder: Encoder<TState>, state: TState):
+    Encoder<TState>
+{
+    const data = new Float32Array(encoder.size);
+    encoder.encode(data, state);
+    return {
+        encode(arr)
+        {
+            checkLength(arr, data.length);
+            arr.set(data);
+        },
+        size: data.length
+    };
+}
+
 /**
  * Creates an Encoder that maps over a collection of states.
  * @param length Number of state objects to encode.
@@ -96,10 +113,27 @@ export function concat<TState>(...encoders: Encoder<TState>[]):
 export function map<TState>(length: number, encoder: Encoder<TState>):
     Encoder<ArrayLike<TState>>
 {
-    return concat(
-        assertEncoder(states => checkLength(states, length)),
-        ...Array.from({length}, (_, i) =>
-            augment((states: ArrayLike<TState>) => states[i], encoder)));
+    // each state gets a fixed-size slice, so offsets are just multiples of the
+    //  encoder's size
+    const {size} = encoder;
+    const totalSize = length * size;
+    return {
+        encode(arr, states)
+        {
+            checkLength(states, length);
+            if (arr.length !== totalSize)
+            {
+                throw new Error("map() encoder didn't fill the given array " +
+                    `(filled ${totalSize} numbers, given ${arr.length})`);
+            }
+            for (let i = 0; i < length; ++i)
+            {
+                encoder.encode(arr.subarray(i * size, (i + 1) * size),
+                    states[i]);
+            }
+        },
+        size: totalSize
+    };
 }
 
 /**
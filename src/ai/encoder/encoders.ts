@@ -23,8 +23,8 @@ import { ReadonlyVariableTempStatus } from
     "../../battle/state/VariableTempStatus";
 import { ReadonlyMoveStatus, ReadonlyVolatileStatus } from
     "../../battle/state/VolatileStatus";
-import { assertEncoder, augment, concat, Encoder, map, nullable, optional } from
-    "./Encoder";
+import { assertEncoder, augment, concat, constant, Encoder, map, nullable,
+    optional } from "./Encoder";
 import { booleanEncoder, checkLength, fillEncoder, limitedStatusTurns,
     numberEncoder, oneHotEncoder, zeroEncoder } from "./helpers";
 
@@ -35,20 +35,21 @@ import { booleanEncoder, checkLength, fillEncoder, limitedStatusTurns,
 export function possibilityClassEncoder(keys: readonly string[]):
     Encoder<ReadonlyPossibilityClass<any>>
 {
+    // map each key to its array index so only the possible values need to be
+    //  visited rather than every key
+    const indexes = new Map(keys.map((key, i) => [key, i]));
     return {
         encode(arr, pc)
         {
             checkLength(arr, keys.length);
-            if (pc.size < 0)
-            {
-                arr.fill(0);
-                return;
-            }
+            arr.fill(0, 0, keys.length);
+            if (pc.size <= 0) return;
 
             const sumR = 1 / pc.size;
-            for (let i = 0; i < keys.length; ++i)
+            for (const key of pc.possibleValues)
             {
-                arr[i] = pc.isSet(keys[i]) ? sumR : 0;
+                const i = indexes.get(key);
+                if (i !== undefined) arr[i] = sumR;
             }
         },
         size: keys.length
@@ -417,9 +418,15 @@ export const constrainedMoveEncoder: Encoder<ConstrainedMoveArgs> =
             {
                 checkLength(arr, dex.moveKeys.length);
                 // encode constraint data
-                for (let i = 0; i < dex.moveKeys.length; ++i)
+                // constraints usually mention only a handful of moves, so
+                //  scatter those rather than looking up every move key
+                arr.fill(0, 0, dex.moveKeys.length);
+                for (const name in constraint)
                 {
-                    arr[i] = (constraint[dex.moveKeys[i]] ?? 0) / total;
+                    if (!constraint.hasOwnProperty(name)) continue;
+                    const data = dex.moves[name];
+                    if (!data) continue;
+                    arr[data.uid] = constraint[name] / total;
                 }
             },
             size: dex.moveKeys.length
@@ -563,8 +570,11 @@ export const inactivePokemonEncoder: Encoder<ReadonlyPokemon> = concat(
         return [0.5, 0.5];
     }, map(2, numberEncoder)));
 
-/** Encoder for an unrevealed Pokemon. */
-export const unknownPokemonEncoder: Encoder<null> = concat(
+/**
+ * Encoder for an unrevealed Pokemon. Unknown bench slots are common and always
+ * encode the same way, so the result is cached.
+ */
+export const unknownPokemonEncoder: Encoder<null> = constant(concat(
     unknownPokemonTraitsEncoder,
     zeroEncoder(2 * dex.itemKeys.length), // item + lastItem
     unknownMovesetEncoder,
@@ -572,17 +582,22 @@ export const unknownPokemonEncoder: Encoder<null> = concat(
     fillEncoder(1, 1), // happiness guess
     unknownHPEncoder,
     unknownMajorStatusCounterEncoder,
-    fillEncoder(0.5, 2)); // grounded guess
+    fillEncoder(0.5, 2)), // grounded guess
+    null);
 
-/** Encoder for an empty Pokemon slot. */
-export const emptyPokemonEncoder: Encoder<undefined> = concat(
+/**
+ * Encoder for an empty Pokemon slot. Empty bench slots are common and always
+ * encode the same way, so the result is cached.
+ */
+export const emptyPokemonEncoder: Encoder<undefined> = constant(concat(
     emptyPokemonTraitsEncoder,
     fillEncoder(0, 2 * dex.itemKeys.length), // item + lastItem
     emptyMovesetEncoder,
     fillEncoder(-1, 4), // gender + happiness
     emptyHPEncoder,
     emptyMajorStatusCounterEncoder,
-    fillEncoder(-1, 2)); // grounded
+    fillEncoder(-1, 2)), // grounded
+    undefined);
 
 /** Encoder for a benched Pokemon slot, which may be unknown or empty. */
 export const benchedPokemonEncoder = optional(inactivePokemonEncoder,
@@ -125,8 +125,8 @@ export function oneHotEncoder(size: number): Encoder<OneHotEncoderArgs>
         encode(arr, {id, one = 1, zero = 0})
         {
             checkLength(arr, size);
-            if (id === null || id < 0 || id >= size) arr.fill(zero);
-            else for (let i = 0; i < size; ++i) arr[i] = i === id ? one : zero;
+            arr.fill(zero, 0, size);
+            if (id !== null && id >= 0 && id < size) arr[id] = one;
         },
         size
     };
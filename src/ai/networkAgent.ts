@@ -1,6 +1,7 @@
 import * as tf from "@tensorflow/tfjs";
 import { BattleAgent } from "../battle/agent/BattleAgent";
 import { intToChoice } from "../battle/agent/Choice";
+import { ReadonlyBattleState } from "../battle/state/BattleState";
 import { allocUnsafe, battleStateEncoder } from "./encoder/encoders";
 import { policyAgent, PolicyType } from "./policyAgent";
 
@@ -34,25 +35,38 @@ export function networkAgent(model: tf.LayersModel, policy: PolicyType,
     verifyModel(model);
     return policyAgent(async function(state)
         {
-            const stateData = allocUnsafe(battleStateEncoder);
-            battleStateEncoder.encode(stateData, state);
-            const stateTensor = tf.tensor2d(stateData,
-                [1, battleStateEncoder.size]);
-
-            const [probsTensor, valueTensor] = tf.tidy(function()
-            {
-                const [actProbs, stateValue] =
-                    model.predict(stateTensor) as tf.Tensor[];
-                return [actProbs.as1D(), stateValue.asScalar()];
-            });
-            const probsData = await probsTensor.data() as Float32Array;
-            callback(
-                {state: stateTensor, probs: probsTensor, value: valueTensor});
+            const data = predict(model, state);
+            const probsData = await data.probs.data() as Float32Array;
+            callback(data);
             return probsData;
         },
         policy);
 }
 
+/**
+ * Encodes a battle state and runs it through the neural network.
+ * @param model The neural network.
+ * @param state Battle state to encode.
+ * @returns The input and output tensors, which the caller must dispose.
+ */
+function predict(model: tf.LayersModel, state: ReadonlyBattleState):
+    NetworkData
+{
+    const stateData = allocUnsafe(battleStateEncoder);
+    battleStateEncoder.encode(stateData, state);
+    const stateTensor = tf.tensor2d(stateData, [1, battleStateEncoder.size]);
+
+    const [probsTensor, valueTensor] = tf.tidy(function()
+    {
+        // skip predict()'s batching/validation overhead since we only ever
+        //  feed in a single, already verified state
+        const [actProbs, stateValue] =
+            model.predictOnBatch(stateTensor) as tf.Tensor[];
+        return [actProbs.as1D(), stateValue.asScalar()];
+    });
+    return {state: stateTensor, probs: probsTensor, value: valueTensor};
+}
+
 /**
  * Verifies a neural network model to make sure its input and output shapes
  * are acceptable for constructing a `networkAgent()` with. Throws if invalid.
@@ -18,25 +18,33 @@ export type PolicyType = "deterministic" | "stochastic";
  * @see choiceIds
  */
 type Sorter = (probs: Float32Array, choices: Choice[]) => void;
+/**
+ * Scratch mask for the stochastic sorter, indexed by choice id. Safe to share
+ * since sorters run synchronously.
+ */
+const availableMask = new Uint8Array(intToChoice.length);
 /** Choice sorters for each PolicyType. */
 const sorters: {readonly [T in PolicyType]: Sorter} =
 {
     deterministic(probs, choices)
     {
-        choices.sort((a, b) =>
-            probs[choiceIds[b]] - probs[choiceIds[a]]);
+        // look up each choice's id once rather than on every comparison
+        const ids = choices.map(c => choiceIds[c]);
+        ids.sort((a, b) => probs[b] - probs[a]);
+        for (let i = 0; i < ids.length; ++i) choices[i] = intToChoice[ids[i]];
     },
     stochastic(probs, choices)
     {
-        const allChoices = [...intToChoice];
-        weightedShuffle([...probs], allChoices);
+        const allIds = intToChoice.map((_, i) => i);
+        weightedShuffle([...probs], allIds);
         // sort actual choices array in-place based on the positions within the
-        //  shuffled allChoices array
-        const choiceSet = new Set(choices);
+        //  shuffled allIds array
+        availableMask.fill(0);
+        for (const choice of choices) availableMask[choiceIds[choice]] = 1;
         let j = 0;
-        for (const choice of allChoices)
+        for (const id of allIds)
         {
-            if (choiceSet.has(choice)) choices[j++] = choice;
+            if (availableMask[id]) choices[j++] = intToChoice[id];
         }
     }
 };
@@ -1,6 +1,7 @@
 // istanbul ignore file
 import * as tf from "@tensorflow/tfjs";
 import { join } from "path";
+import { battleStateEncoder } from "../ai/encoder/encoders";
 import { networkAgent } from "../ai/networkAgent";
 import { avatar, latestModelFolder, loginServer, password, playServer,
     username } from "../config";
@@ -33,6 +34,11 @@ const logger = Logger.stdout;
         `file://${join(latestModelFolder, "model.json")}`);
     const agent = networkAgent(model, "deterministic");
 
+    // warmup the model using dummy data so that the first decision of the
+    //  first battle doesn't have to pay for backend initialization
+    tf.tidy(() =>
+        { model.predictOnBatch(tf.zeros([1, battleStateEncoder.size])); });
+
     // configure client to accept certain challenges
     bot.acceptChallenges("gen4randombattle",
         (room, user, sender) =>
@@ -4,6 +4,7 @@ import * as tmp from "tmp-promise";
 import { Logger } from "../Logger";
 import { AlgorithmArgs } from "./nn/learn/LearnArgs";
 import { NetworkProcessor } from "./nn/worker/NetworkProcessor";
+import { GamePool } from "./play/GamePool";
 import { Opponent, playGames } from "./play/playGames";
 import { SimName } from "./sim/simulators";
 
@@ -72,6 +73,10 @@ export async function episode(
         return;
     }
 
+    // start up the evaluation game workers while training so they're ready to
+    //  go by the time it's done
+    const evalPool = new GamePool();
+
     // train over the experience gained from each game
     logger.debug("Training over experience");
     let progress: ProgressBar | undefined;
@@ -88,45 +93,53 @@ export async function episode(
             });
         progress.render({loss: "n/a"});
     }
-    await processor.learn(model,
-        {
-            aexpPaths: expFiles.map(f => f.path), numAExps, algorithm, epochs,
-            batchSize, logPath
-        },
-        function(data)
-        {
-            switch (data.type)
+
+    // make sure the eval workers don't outlive a failed training/eval run,
+    //  otherwise they'd keep the process alive
+    try
+    {
+        await processor.learn(model,
+            {
+                aexpPaths: expFiles.map(f => f.path), numAExps, algorithm,
+                epochs, batchSize, logPath
+            },
+            function(data)
             {
-                case "start":
-                    numBatches = data.numBatches;
-                    startProgress();
-                    break;
+                switch (data.type)
+                {
+                    case "start":
+                        numBatches = data.numBatches;
+                        startProgress();
+                        break;
 
-                case "epoch":
-                    // ending summary statement for the current epoch
-                    progress?.terminate();
-                    logger.debug(`Epoch ${data.epoch}/${epochs}: Avg loss = ` +
-                        data.loss);
+                    case "epoch":
+                        // ending summary statement for the current epoch
+                        progress?.terminate();
+                        logger.debug(`Epoch ${data.epoch}/${epochs}: ` +
+                            `Avg loss = ${data.loss}`);
 
-                    // restart progress bar for the next epoch
-                    if (data.epoch < epochs) startProgress();
-                    break;
-                case "batch":
-                    progress?.tick(data);
-                    break;
-            }
-        });
-    progress?.terminate();
-    const cleanupPromise = expFiles.map(f => f.cleanup());
+                        // restart progress bar for the next epoch
+                        if (data.epoch < epochs) startProgress();
+                        break;
+                    case "batch":
+                        progress?.tick(data);
+                        break;
+                }
+            });
+        progress?.terminate();
+        const cleanupPromises = expFiles.map(f => f.cleanup());
 
-    // evaluation games
-    logger.debug("Evaluating new network against benchmarks");
-    const evalPromise = playGames(
-    {
-        processor, agentConfig: {model, exp: false}, opponents: evalOpponents,
-        simName, maxTurns, logger: logger.addPrefix("Eval: "),
-        ...(logPath && {logPath: join(logPath, "eval")})
-    });
+        // evaluation games
+        logger.debug("Evaluating new network against benchmarks");
+        const evalPromise = playGames(
+        {
+            processor, agentConfig: {model, exp: false},
+            opponents: evalOpponents, simName, maxTurns,
+            logger: logger.addPrefix("Eval: "),
+            ...(logPath && {logPath: join(logPath, "eval")}), pool: evalPool
+        });
 
-    await Promise.all([cleanupPromise, evalPromise]);
+        await Promise.all([...cleanupPromises, evalPromise]);
+    }
+    finally { await evalPool.close(); }
 }
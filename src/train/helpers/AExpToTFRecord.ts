@@ -13,20 +13,6 @@ export class AExpToTFRecord extends Transform
     /** TFRecord Example builder. */
     private readonly builder = tfrecord.createBuilder();
 
-    // adapted from tfrecord/src/record_writer.ts and writer.ts
-    /**
-     * Main metadata buffer that wraps serialized TFRecord Examples. Reused for
-     * each `_transform` call to save on allocations.
-     */
-    private readonly metadata = new ArrayBuffer(headerBytes);
-    /** Buffer for reading 8byte length and 4byte crc32c header. */
-    private readonly lengthAndCrcBuffer = new Uint8Array(this.metadata, 0,
-        headerBytes);
-    /** View for extracting 8byte length and 4byte crc32c header. */
-    private readonly lengthAndCrc = new DataView(this.metadata, 0, headerBytes);
-    /** Points to length for crc32c computations. */
-    private readonly lengthBuffer = Buffer.from(this.metadata, 0, lengthBytes);
-
     /**
      * Creates an AExpToTFRecord stream.
      * @param maxExp High water mark for the AugmentedExperience buffer. If the
@@ -39,9 +25,6 @@ export class AExpToTFRecord extends Transform
             encoding: "binary",
             writableObjectMode: true, writableHighWaterMark: maxExp
         });
-
-        // high order bits of length segment should stay unset
-        this.lengthAndCrc.setUint32(4, 0, /*littleEndian*/ true);
     }
 
     /** @override */
@@ -57,21 +40,26 @@ export class AExpToTFRecord extends Transform
             throw new Error("Example encoder didn't use Buffers");
         }
 
-        // encode length in metadata
-        this.lengthAndCrc.setUint32(0, record.length, /*littleEndian*/ true);
+        // adapted from tfrecord/src/record_writer.ts and writer.ts
+        // write the whole record in one frame so the stream only has to handle
+        //  one chunk per record
+        const frame = Buffer.allocUnsafe(
+            headerBytes + record.length + footerBytes);
 
         // compute header
-        this.lengthAndCrc.setUint32(lengthBytes,
-            maskedCrc32c(this.lengthBuffer), /*littleEndian*/ true);
-        this.push(this.lengthAndCrcBuffer, "binary");
+        frame.writeUInt32LE(record.length, 0);
+        // high order bits of length segment should stay unset
+        frame.writeUInt32LE(0, 4);
+        frame.writeUInt32LE(maskedCrc32c(frame.subarray(0, lengthBytes)),
+            lengthBytes);
 
         // insert serialized Example
-        this.push(record, "binary");
+        record.copy(frame, headerBytes);
 
         // compute footer
-        this.lengthAndCrc.setUint32(0, maskedCrc32c(record),
-            /*littleEndian*/ true);
-        this.push(this.lengthAndCrcBuffer.slice(0, footerBytes), "binary");
+        frame.writeUInt32LE(maskedCrc32c(record), headerBytes + record.length);
+
+        this.push(frame, "binary");
 
         callback();
     }
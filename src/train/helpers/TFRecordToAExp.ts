@@ -221,14 +221,9 @@ export class TFRecordToAExp extends Transform
         this.dataBuffer.copy(buffer, 0, 0, bytesConsumed);
 
         // remove the consumed bytes out of the data buffer
-        if (totalBuffer - length === 0) this.dataBuffer = null;
-        else
-        {
-            // splice buffer
-            const newBuf = Buffer.allocUnsafe(totalBuffer - length)
-            this.dataBuffer.copy(newBuf, 0, length); // everything after length
-            this.dataBuffer = newBuf;
-        }
+        if (totalBuffer <= length) this.dataBuffer = null;
+        // view everything after length rather than copying it to a new buffer
+        else this.dataBuffer = this.dataBuffer.subarray(length);
 
         return bytesConsumed;
     }
@@ -245,7 +240,9 @@ export class TFRecordToAExp extends Transform
         const chunks: Buffer[] = [];
         let bytesRead = 0;
 
-        while ((this.dataBuffer?.length ?? 0) + bytesRead < length)
+        // data buffer isn't touched until after the loop
+        const bytesNeeded = length - (this.dataBuffer?.length ?? 0);
+        while (bytesRead < bytesNeeded)
         {
             // add the next chunk to the data buffer
             const chunk = await this.readChunk();
@@ -26,6 +26,8 @@ export abstract class ThreadPool<TWorker extends WorkerPort<TMap>,
     private readonly freePorts: TWorker[] = [];
     /** Errored worker ports that have yet to be returned. */
     private readonly erroredPorts = new Set<TWorker>();
+    /** Callers of `#takePort()` waiting for a free port, in FIFO order. */
+    private readonly portWaiters: ((port: TWorker) => void)[] = [];
 
     /**
      * Creates a ThreadPool.
@@ -61,14 +63,10 @@ export abstract class ThreadPool<TWorker extends WorkerPort<TMap>,
      */
     public async takePort(): Promise<TWorker>
     {
-        // wait until a port is open
-        while (this.freePorts.length <= 0)
-        {
-            await new Promise<void>(res =>
-                this.once(ThreadPool.workerFreedEvent, res));
-        }
+        if (this.freePorts.length > 0) return this.freePorts.pop()!;
 
-        return this.freePorts.pop()!;
+        // wait in line until a port is handed to us
+        return new Promise(res => this.portWaiters.push(res));
     }
 
     /** Returns a worker port to the pool. */
@@ -85,8 +83,7 @@ export abstract class ThreadPool<TWorker extends WorkerPort<TMap>,
             throw new Error("WorkerPort doesn't belong to this ThreadPool");
         }
 
-        this.freePorts.push(port);
-        this.emit(ThreadPool.workerFreedEvent);
+        this.freePort(port);
     }
 
     /**
@@ -144,7 +141,18 @@ export abstract class ThreadPool<TWorker extends WorkerPort<TMap>,
         });
 
         this.ports.add(port);
-        this.freePorts.push(port);
+        this.freePort(port);
+    }
+
+    /**
+     * Hands a free port directly to the next `#takePort()` caller, or puts it
+     * back in the pool if nothing is waiting.
+     */
+    private freePort(port: TWorker): void
+    {
+        const waiter = this.portWaiters.shift();
+        if (waiter) waiter(port);
+        else this.freePorts.push(port);
         this.emit(ThreadPool.workerFreedEvent);
     }
 }
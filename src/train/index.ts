@@ -12,6 +12,12 @@ import { Opponent } from "./play/playGames";
 
 setGracefulCleanup();
 
+// the libuv threadpool is shared between all worker threads, and the default of
+//  4 threads would otherwise bottleneck the file io of every game worker (game
+//  logs and experience files)
+// must be set before the threadpool is first used
+process.env.UV_THREADPOOL_SIZE ??= `${Math.max(4, os.cpus().length)}`;
+
 /** Number of training episodes to complete. */
 const numEpisodes = 4;
 /** Max amount of evaluation games against one ancestor. */
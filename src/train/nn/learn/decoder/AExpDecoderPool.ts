@@ -8,11 +8,19 @@ import { DecoderRequestMap } from "./DecoderRequest";
 /** Path to the decoder worker script. */
 const workerScriptPath = path.resolve(__dirname, "decoder.js");
 
+/**
+ * Max number of AugmentedExperiences to request from a decoder worker at a
+ * time, to cut down on message round trips.
+ */
+const decodeBatchSize = 16;
+
 /** Uses a `worker_threads` pool to dispatch parallel tfrecord decoders. */
 export class AExpDecoderPool extends ThreadPool<DecoderPort, DecoderRequestMap>
 {
     /** Indicates that the thread pool is in use. */
     private inUse = Promise.resolve();
+    /** Callbacks for aborting each in-progress `#decode()` call. */
+    private readonly aborts = new Set<() => void>();
 
     /**
      * Creates an AExpDecoderPool.
@@ -24,6 +32,19 @@ export class AExpDecoderPool extends ThreadPool<DecoderPort, DecoderRequestMap>
         super(workerScriptPath, DecoderPort, undefined, numThreads);
     }
 
+    /**
+     * Aborts any in-progress decoding before closing each port, since a
+     * consumer that stopped reading early would otherwise leave decoder threads
+     * waiting on backpressure that never gets relieved.
+     * @override
+     */
+    public async close(): Promise<void>
+    {
+        for (const abort of this.aborts) abort();
+        this.aborts.clear();
+        await super.close();
+    }
+
     /**
      * Dispatches the thread pool to decode the files.
      * @param files Files to decode.
@@ -54,6 +75,18 @@ export class AExpDecoderPool extends ThreadPool<DecoderPort, DecoderRequestMap>
             read() { this.emit(readAExpEvent); }
         });
 
+        // signal to prematurely close the thread pool
+        let done = false;
+        const abort = function()
+        {
+            done = true;
+            // wake up threads waiting on backpressure so they can return their
+            //  ports
+            aexpInput.emit(readAExpEvent);
+            aexpInput.destroy();
+        };
+        this.aborts.add(abort);
+
         // setup path generator
         // this lets each thread take the next file after finishing the previous
         //  one without repeating
@@ -64,7 +97,6 @@ export class AExpDecoderPool extends ThreadPool<DecoderPort, DecoderRequestMap>
 
         // setup threads for loading/extracting tfrecords
         const threadPromises: Promise<void>[] = [];
-        let done = false; // signal to prematurely close the thread pool
         for (let i = 0; i < this.numThreads; ++i)
         {
             threadPromises.push(this.takePort()
@@ -78,14 +110,24 @@ export class AExpDecoderPool extends ThreadPool<DecoderPort, DecoderRequestMap>
                             if (done) break;
                             // extract all aexps from the file and push to the
                             //  aexpInput stream
-                            let aexp: AugmentedExperience | null;
-                            while (!done && (aexp = await port.decode(file)))
+                            let aexps: AugmentedExperience[];
+                            do
                             {
+                                aexps = await port.decode(file,
+                                    decodeBatchSize);
+                                if (done) break;
+                                let ready = true;
+                                for (const aexp of aexps)
+                                {
+                                    ready = aexpInput.push(aexp);
+                                }
                                 // respect backpressure
-                                if (aexpInput.push(aexp)) continue;
+                                if (ready) continue;
                                 await new Promise(
                                     res => aexpInput.once(readAExpEvent, res));
                             }
+                            // stop once the file has been exhausted
+                            while (!done && aexps.length >= decodeBatchSize);
                         }
                     }
                     // rethrow
@@ -106,10 +148,14 @@ export class AExpDecoderPool extends ThreadPool<DecoderPort, DecoderRequestMap>
                 aexpInput.emit(readAExpEvent);
             });
 
-        // generator loop
-        for await (const aexp of aexpInput) yield aexp;
+        try
+        {
+            // generator loop
+            for await (const aexp of aexpInput) yield aexp;
 
-        // force errors to propagate, if any
-        await allDone;
+            // force errors to propagate, if any
+            await allDone;
+        }
+        finally { this.aborts.delete(abort); }
     }
 }
@@ -6,18 +6,22 @@ import { DecodeMessage, DecoderRequestMap } from "./DecoderRequest";
 export class DecoderPort extends WorkerPort<DecoderRequestMap>
 {
     /**
-     * Asks for the next AugmentedExperience in the given tfrecord file. If the
-     * Promise resolves to null, then the worker has reached the end of the file
-     * and the next call will restart from the beginning.
+     * Asks for the next batch of AugmentedExperiences in the given tfrecord
+     * file. If the Promise resolves to fewer than `maxAExps` entries, then the
+     * worker has reached the end of the file and the next call will restart
+     * from the beginning.
+     * @param path Path to the file to decode.
+     * @param maxAExps Max number of AugmentedExperiences to get back.
      */
-    public decode(path: string): Promise<AugmentedExperience | null>
+    public decode(path: string, maxAExps: number):
+        Promise<AugmentedExperience[]>
     {
         const msg: DecodeMessage =
-            {type: "decode", rid: this.generateRID(), path};
+            {type: "decode", rid: this.generateRID(), path, maxAExps};
 
         return new Promise((res, rej) =>
             this.postMessage<"decode">(msg, [],
                 result => result.type === "error" ?
-                    rej(result.err) : res(result.aexp)));
+                    rej(result.err) : res(result.aexps)));
     }
 }
@@ -18,11 +18,13 @@ export type DecoderMessage = DecoderRequestMap[DecoderRequestType]["message"];
 /** Base interface for decoder messages. */
 type DecoderMessageBase<T extends DecoderRequestType> = PortMessageBase<T>;
 
-/** Asks for the next AugmentedExperience from the tfrecord file. */
+/** Asks for the next AugmentedExperiences from the tfrecord file. */
 export interface DecodeMessage extends DecoderMessageBase<"decode">
 {
     /** Path to the file to decode. */
     readonly path: string;
+    /** Max number of AugmentedExperiences to send back. */
+    readonly maxAExps: number;
 }
 
 /** Types of messages that the decoder pool can receive. */
@@ -35,10 +37,10 @@ type DecoderResultBase<T extends DecoderRequestType> = PortResultBase<T>;
 export interface DecodeResult extends DecoderResultBase<"decode">
 {
     /**
-     * Decoded experience object. If null, then the file has been completely
-     * exhausted.
+     * Decoded experience objects, in file order. If there are fewer than the
+     * requested amount, then the file has been completely exhausted.
      */
-    aexp: AugmentedExperience | null;
+    aexps: AugmentedExperience[];
     /**
      * Guaranteed one reply per message.
      * @override
@@ -79,14 +79,21 @@ parentPort.on("message", (msg: DecoderMessage) =>
     const decoder = decoders.get(msg.path)!;
 
     decoder.inUse = decoder.inUse
-        .then(async function nextAExp()
+        .then(async function nextAExps()
         {
-            // get the next aexp (or null if file exhausted)
-            const aexp = (await decoder.gen.next()).value;
+            // get the next batch of aexps, stopping early if file exhausted
+            const aexps: AugmentedExperience[] = [];
+            const transferList: ArrayBuffer[] = [];
+            while (aexps.length < msg.maxAExps)
+            {
+                const aexp = (await decoder.gen.next()).value;
+                if (!aexp) break;
+                aexps.push(aexp);
+                transferList.push(aexp.probs.buffer, aexp.state.buffer);
+            }
             const result: DecodeResult =
-                {type: "decode", rid: msg.rid, done: true, aexp};
-            parentPort!.postMessage(result,
-                aexp ? [aexp.probs.buffer, aexp.state.buffer] : undefined);
+                {type: "decode", rid: msg.rid, done: true, aexps};
+            parentPort!.postMessage(result, transferList);
         })
         .catch((err: Error) =>
         {
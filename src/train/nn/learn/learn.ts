@@ -61,8 +61,8 @@ function loss(
         const probsMasked = tf.mul(mask, probs);
         const actProbs = tf.sum(probsMasked, 1);
 
-        // loss needs a placeholder value so the typings work out
-        const result: LossResult = {loss: tf.scalar(0)};
+        // metrics are recorded as they're computed, total loss comes last
+        const result: Omit<LossResult, "loss"> = {};
 
         // calculate policy gradient objective function
         let pgObjs: tf.Tensor;
@@ -79,13 +79,13 @@ function loss(
             {
                 case "clipped":
                 {
-                    // simplified version of the PPO clipped loss function
-                    const bounds = tf.where(
-                            tf.greaterEqual(advantage, tf.zerosLike(advantage)),
-                            tf.fill(advantage.shape, 1 + algorithm.epsilon),
-                            tf.fill(advantage.shape, 1 - algorithm.epsilon));
+                    // PPO clipped loss function
+                    // clip bounds are scalars, so no need to materialize
+                    //  per-sample bounds tensors
+                    const clipped = tf.clipByValue(ratio,
+                            1 - algorithm.epsilon, 1 + algorithm.epsilon);
                     pgObjs = tf.minimum(tf.mul(ratio, advantage),
-                            tf.mul(bounds, advantage));
+                            tf.mul(clipped, advantage));
                     break;
                 }
                 case "klFixed":
@@ -109,8 +109,7 @@ function loss(
         // calculate main policy gradient loss
         // by minimizing loss, we maximize the objective
         const pgLoss = tf.keep(tf.neg(tf.mean(pgObjs)).asScalar());
-        tf.dispose(result.loss);
-        result.loss = result.pgLoss = pgLoss;
+        result.pgLoss = pgLoss;
 
         const losses: tf.Scalar[] = [pgLoss];
 
@@ -137,9 +136,9 @@ function loss(
         }
 
         // sum all the losses together
-        if (losses.length > 1) result.loss = tf.keep(tf.addN(losses));
+        const totalLoss = losses.length > 1 ? tf.keep(tf.addN(losses)) : pgLoss;
 
-        return result;
+        return {...result, loss: totalLoss};
     });
 }
 
@@ -159,21 +158,18 @@ type BatchedAExp =
 /**
  * Wraps a set of `.tfrecord` files as a TensorFlow Dataset, parsing each file
  * in parallel and shuffling according to the preftech buffer.
+ * @param pool Thread pool for decoding the files.
  * @param aexpPaths Array of paths to the `.tfrecord` files holding the
  * AugmentedExperiences.
  * @param batchSize AugmentedExperience batch size.
- * @param numThreads Max number of files to read in parallel. Defaults to the
- * number of CPUs on the current system.
  * @param prefetch Amount to buffer for prefetching/shuffling.
  * @returns A TensorFlow Dataset that contains batched AugmentedExperience
  * objects.
  */
-function createAExpDataset(aexpPaths: readonly string[],
-    batchSize: number, prefetch = 128, numThreads?: number):
+function createAExpDataset(pool: AExpDecoderPool,
+    aexpPaths: readonly string[], batchSize: number, prefetch = 128):
     tf.data.Dataset<BatchedAExp>
 {
-    const pool = new AExpDecoderPool(numThreads);
-
     return tf.data.generator<TensorAExp>(
             // tensorflow supports async generators, but the typings don't
             () => pool.decode(aexpPaths, prefetch) as any)
@@ -184,8 +180,9 @@ function createAExpDataset(aexpPaths: readonly string[],
         .batch(batchSize)
         // make sure action indexes are integers
         .map(((batch: BatchedAExp) =>
-            ({...batch, action: batch.action.cast("int32")})) as any) as
-                tf.data.Dataset<BatchedAExp>;
+            ({...batch, action: batch.action.cast("int32")})) as any)
+        // stack the next batch while the current one is being trained on
+        .prefetch(1) as tf.data.Dataset<BatchedAExp>;
 }
 
 /** Data to train on. */
@@ -233,126 +230,147 @@ export async function learn(
     const optimizer = tf.train.adam(1e-5);
     const variables = model.trainableWeights.map(w => w.read() as tf.Variable);
 
-    callback?.({type: "start", numBatches: Math.ceil(numAExps / batchSize)});
-    await callbacks.onTrainBegin();
+    // algorithm config doesn't change between batches, so check once whether
+    //  the kl penalty coefficient needs to be adapted after each batch
+    const klAdaptive =
+        algorithm.type === "ppo" && algorithm.variant === "klAdaptive" ?
+            algorithm : null;
+
+    // decoder threads are reused for each epoch
+    const pool = new AExpDecoderPool(
+        /*numThreads*/ Math.ceil(os.cpus().length / 2));
 
-    for (let i = 0; i < epochs; ++i)
+    // make sure the decoder threads are cleaned up even if training fails
+    try
     {
-        const epochLogs:
-            {[name: string]: tf.Scalar | number, loss: tf.Scalar} = {} as any;
-        await callbacks.onEpochBegin(i, epochLogs);
-
-        const metricsPerBatch:
-            {[name: string]: tf.Scalar[], loss: tf.Scalar[]} = {loss: []};
-        let batchId = 0;
-
-        await createAExpDataset(aexpPaths, batchSize,
-                /*prefetch*/ 16 * 128,
-                /*numThreads*/ Math.ceil(os.cpus().length / 2))
-            // setup dataset loop
-            .mapAsync(async function(batch: BatchedAExp)
-            {
-                const batchLogs: {[name: string]: tf.Scalar | number} =
-                    {batch: batchId, size: batch.state.shape[0]};
-                await callbacks.onBatchBegin(batchId, batchLogs);
-                // create loss function that records the metrics data
-                let kl: tf.Scalar | undefined;
-                function f()
-                {
-                    const result = tf.tidy(() => loss(
-                    {
-                        model, state: batch.state, oldProbs: batch.probs,
-                        action: batch.action, returns: batch.returns,
-                        advantage: batch.advantage, algorithm
-                    }));
+        callback?.(
+            {type: "start", numBatches: Math.ceil(numAExps / batchSize)});
+        await callbacks.onTrainBegin();
 
-                    for (const name in result)
+        for (let i = 0; i < epochs; ++i)
+        {
+            const epochLogs:
+                {[name: string]: tf.Scalar | number, loss: tf.Scalar} =
+                    {} as any;
+            await callbacks.onEpochBegin(i, epochLogs);
+
+            const metricsPerBatch:
+                {[name: string]: tf.Scalar[], loss: tf.Scalar[]} = {loss: []};
+            let batchId = 0;
+
+            await createAExpDataset(pool, aexpPaths, batchSize,
+                    /*prefetch*/ 16 * 128)
+                // setup dataset loop
+                .mapAsync(async function(batch: BatchedAExp)
+                {
+                    const batchLogs: {[name: string]: tf.Scalar | number} =
+                        {batch: batchId, size: batch.state.shape[0]};
+                    await callbacks.onBatchBegin(batchId, batchLogs);
+                    // create loss function that records the metrics data
+                    let kl: tf.Scalar | undefined;
+                    function f()
                     {
-                        if (!result.hasOwnProperty(name)) continue;
-                        const metric = result[name as keyof LossResult];
-                        if (!metric) continue;
+                        const result = tf.tidy(() => loss(
+                        {
+                            model, state: batch.state, oldProbs: batch.probs,
+                            action: batch.action, returns: batch.returns,
+                            advantage: batch.advantage, algorithm
+                        }));
 
-                        // record metrics for epoch average later
-                        if (!metricsPerBatch.hasOwnProperty(name))
+                        for (const name in result)
                         {
-                            metricsPerBatch[name] = [metric];
-                        }
-                        else metricsPerBatch[name].push(metric);
+                            if (!result.hasOwnProperty(name)) continue;
+                            const metric = result[name as keyof LossResult];
+                            if (!metric) continue;
+
+                            // record metrics for epoch average later
+                            if (!metricsPerBatch.hasOwnProperty(name))
+                            {
+                                metricsPerBatch[name] = [metric];
+                            }
+                            else metricsPerBatch[name].push(metric);
 
-                        // record metrics for batch summary
-                        // if using tensorboard, requires updateFreq=batch
-                        batchLogs[name] = tf.keep(metric.clone());
+                            // record metrics for batch summary
+                            // if using tensorboard, requires updateFreq=batch
+                            batchLogs[name] = tf.keep(metric.clone());
 
-                        // record kl for adaptive penalty
-                        if (name === "kl") kl = metric;
+                            // record kl for adaptive penalty
+                            if (name === "kl") kl = metric;
+                        }
+                        return result.loss;
                     }
-                    return result.loss;
-                }
 
-                // compute the gradients for this batch
-                // don't dispose() the cost tensor since it's being used in
-                //  metricsPerBatch as well
-                const cost = optimizer.minimize(f, /*returnCost*/true,
-                    variables)!;
+                    // compute the gradients for this batch
+                    // don't dispose() the cost tensor since it's being used in
+                    //  metricsPerBatch as well
+                    const cost = optimizer.minimize(f, /*returnCost*/true,
+                        variables)!;
 
-                // update adaptive kl penalty if applicable
-                if (algorithm.type === "ppo" &&
-                    algorithm.variant === "klAdaptive" && kl)
-                {
-                    const klValue = await kl.array();
-                    if (algorithm.beta === undefined) algorithm.beta = 1;
+                    // update adaptive kl penalty if applicable
+                    if (klAdaptive && kl)
+                    {
+                        const klValue = await kl.array();
+                        if (klAdaptive.beta === undefined) klAdaptive.beta = 1;
 
-                    // adapt penalty coefficient
-                    const target = algorithm.klTarget;
-                    if (klValue < target / 1.5) algorithm.beta /= 2;
-                    else if (klValue > target * 1.5) algorithm.beta *= 2;
+                        // adapt penalty coefficient
+                        const target = klAdaptive.klTarget;
+                        if (klValue < target / 1.5) klAdaptive.beta /= 2;
+                        else if (klValue > target * 1.5) klAdaptive.beta *= 2;
 
-                    // record new coefficient value
-                    if (!metricsPerBatch.hasOwnProperty("beta"))
-                    {
-                        metricsPerBatch.beta = [tf.scalar(algorithm.beta)];
+                        // record new coefficient value
+                        if (!metricsPerBatch.hasOwnProperty("beta"))
+                        {
+                            metricsPerBatch.beta = [tf.scalar(klAdaptive.beta)];
+                        }
+                        else
+                        {
+                            metricsPerBatch.beta.push(
+                                tf.scalar(klAdaptive.beta));
+                        }
                     }
-                    else metricsPerBatch.beta.push(tf.scalar(algorithm.beta));
-                }
 
-                await Promise.all(
-                [
-                    callbacks.onBatchEnd(batchId, batchLogs),
-                    ...(callback ?
-                        [cost.array().then(costData => callback(
-                            {
-                                type: "batch", epoch: i + 1, batch: batchId,
-                                loss: costData
-                            }))] : [])
-                ]);
-                tf.dispose(batchLogs);
-
-                ++batchId;
-            })
-            // execute dataset loop
-            .forEachAsync(() => {});
-
-        // average all batch metrics
-        for (const name in metricsPerBatch)
-        {
-            if (!metricsPerBatch.hasOwnProperty(name)) continue;
-            epochLogs[name] = tf.tidy(() =>
-                tf.mean(tf.stack(metricsPerBatch[name])).asScalar());
-        }
+                    await Promise.all(
+                    [
+                        callbacks.onBatchEnd(batchId, batchLogs),
+                        ...(callback ?
+                            [cost.array().then(costData => callback(
+                                {
+                                    type: "batch", epoch: i + 1, batch: batchId,
+                                    loss: costData
+                                }))] : [])
+                    ]);
+                    tf.dispose(batchLogs);
+
+                    ++batchId;
+                })
+                // execute dataset loop
+                .forEachAsync(() => {});
+
+            // average all batch metrics
+            for (const name in metricsPerBatch)
+            {
+                if (!metricsPerBatch.hasOwnProperty(name)) continue;
+                epochLogs[name] = tf.tidy(() =>
+                    tf.mean(tf.stack(metricsPerBatch[name])).asScalar());
+            }
 
-        await Promise.all(
-        [
-            callbacks.onEpochEnd(i, epochLogs),
-            ...(callback ?
+            await Promise.all(
             [
-                epochLogs.loss.array()
-                    .then(lossData =>
-                        callback({type: "epoch", epoch: i + 1, loss: lossData}))
-            ] : [])
-        ]);
-        tf.dispose([metricsPerBatch, epochLogs]);
+                callbacks.onEpochEnd(i, epochLogs),
+                ...(callback ?
+                [
+                    epochLogs.loss.array()
+                        .then(lossData => callback(
+                            {type: "epoch", epoch: i + 1, loss: lossData}))
+                ] : [])
+            ]);
+            tf.dispose([metricsPerBatch, epochLogs]);
+        }
+        await callbacks.onTrainEnd();
+    }
+    finally
+    {
+        optimizer.dispose();
+        await pool.close();
     }
-    await callbacks.onTrainEnd();
-
-    optimizer.dispose();
 }
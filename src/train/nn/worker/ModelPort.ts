@@ -103,8 +103,9 @@ export class ModelPort extends
     {
         for (let i = 0; i < arr.length; ++i)
         {
-            if (isNaN(arr[i])) return i;
-            if (Math.abs(arr[i]) > 1) return i;
+            // note: comparisons with NaN are always false, so this also
+            //  catches NaNs in one check
+            if (!(Math.abs(arr[i]) <= 1)) return i;
         }
         return -1;
     }
@@ -120,8 +121,8 @@ export class ModelPort extends
     {
         for (let i = 0; i < arr.length; ++i)
         {
-            if (isNaN(arr[i])) return i;
-            if (arr[i] < 1e-4) return i;
+            // note: also catches NaNs, see verifyInput()
+            if (!(arr[i] >= 1e-4)) return i;
         }
         return -1;
     }
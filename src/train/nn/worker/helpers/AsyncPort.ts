@@ -90,6 +90,13 @@ export type AsyncPortCallback<TMap extends PortRequestMap<string>> =
 export abstract class AsyncPort<TMap extends PortRequestMap<string>,
     TPort extends PortLike>
 {
+    /**
+     * Whether to check that each reply's rid and type match the request it
+     * answers. This wraps every callback in an extra closure, so it's off by
+     * default and meant for debugging new port protocols.
+     */
+    public static checkReplies = false;
+
     /** Counter for assigning request ids. */
     private ridCounter = 0;
     /** Tracks current outgoing requests to the port. */
@@ -166,24 +173,34 @@ export abstract class AsyncPort<TMap extends PortRequestMap<string>,
             throw new Error(`Duplicate rid ${msg.rid}`);
         }
 
-        this.requests.set(msg.rid, (result: TResult<TMap>) =>
+        // replies are looked up by the same rid, so the callback can usually
+        //  be registered as-is
+        if (!AsyncPort.checkReplies)
         {
-            // should never happen
-            if (msg.rid !== result.rid)
+            this.requests.set(msg.rid,
+                callback as (result: TResult<TMap>) => void);
+        }
+        else
+        {
+            this.requests.set(msg.rid, (result: TResult<TMap>) =>
             {
-                throw new Error(`Dispatched rid ${msg.rid} but got back rid ` +
-                    result.rid);
-            }
+                // should never happen
+                if (msg.rid !== result.rid)
+                {
+                    throw new Error(`Dispatched rid ${msg.rid} but got back ` +
+                        `rid ${result.rid}`);
+                }
 
-            // should never happen
-            if (msg.type !== result.type && result.type !== "error")
-            {
-                throw new Error(`Message '${msg.type}' sent but got back ` +
-                    `'${result.type}'`);
-            }
+                // should never happen
+                if (msg.type !== result.type && result.type !== "error")
+                {
+                    throw new Error(`Message '${msg.type}' sent but got back ` +
+                        `'${result.type}'`);
+                }
 
-            callback(result as TResult<TMap, T>);
-        });
+                callback(result as TResult<TMap, T>);
+            });
+        }
         this.port.postMessage(msg, transferList);
     }
 
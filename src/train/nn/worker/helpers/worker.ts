@@ -2,8 +2,6 @@
  * @file Dedicated worker for TensorFlow neural network operations during games.
  */
 import * as tf from "@tensorflow/tfjs";
-import { EventEmitter } from "events";
-import { TypedEmitter } from "tiny-typed-emitter";
 import { serialize } from "v8";
 import { MessageChannel, MessagePort, parentPort, workerData } from
     "worker_threads";
@@ -37,32 +35,21 @@ interface BatchEntry
     res(result: PredictResult): void;
 }
 
-/** Describes the events emitted by `NetworkRegistry#batchEvents`. */
-interface BatchEvents
-{
-    [NetworkRegistry.batchExecuteEvent](): void;
-}
-
 /** Manages a neural network registry. */
 class NetworkRegistry
 {
-    /** Event for when the current batch should be executed. */
-    public static readonly batchExecuteEvent = Symbol("batchExecuteEvent");
-
     /** Neural network object. */
     private readonly model: tf.LayersModel;
+    /** Max number of predict requests to batch before executing them. */
+    private readonly maxBatchSize: number;
+    /** Max time in nanoseconds to wait for a batch to fill up. */
+    private readonly batchTimeoutNs: number;
     /** Currently held game worker ports. */
     private readonly ports = new Set<MessagePort>();
 
     /** Prediction request buffer. */
     private readonly nextBatch: BatchEntry[] = [];
-    /** Event listener for batch entries. */
-    private readonly batchEvents =
-        new EventEmitter({captureRejections: true}) as
-            TypedEmitter<BatchEvents>;
-    /** Resolves once the current batch timer expires. */
-    private timeoutPromise: Promise<void> | null = null;
-    /** Function to cancel the current timer. */
+    /** Function to cancel the current batch timer, if it's running. */
     private cancelTimer: (() => void) | null = null;
     /** Lock promise for managing the neural network resource. */
     private inUse: Promise<any>;
@@ -72,8 +59,7 @@ class NetworkRegistry
      * @param model Neural network object.
      * @param batchOptions Options for batching predict requests.
      */
-    constructor(model: tf.LayersModel,
-        private readonly batchOptions: BatchOptions)
+    constructor(model: tf.LayersModel, batchOptions: BatchOptions)
     {
         try { verifyModel(model); }
         catch (e)
@@ -84,23 +70,22 @@ class NetworkRegistry
         }
         this.model = model;
 
-        this.batchOptions =
-        {
-            ...batchOptions,
-            // max 1 second
-            timeoutNs: Math.min(999999999, batchOptions.timeoutNs)
-        };
-
-        // setup batch event listener
-        this.batchEvents.on(NetworkRegistry.batchExecuteEvent,
-            () => this.executeBatch());
+        // copy out only the fields we need since they're checked on every
+        //  predict request
+        this.maxBatchSize = batchOptions.maxSize;
+        // max 1 second
+        this.batchTimeoutNs = Math.min(999999999, batchOptions.timeoutNs);
 
         // warmup the model using dummy data
         // only useful with gpu backend
+        // uses the same entry point and a full batch like executeBatch() so
+        //  the first real batch doesn't have to pay for initialization
         if (workerData.gpu)
         {
-            const dummyInput = tf.zeros([1, battleStateEncoder.size]);
-            const dummyResult = model.predict(dummyInput) as tf.Tensor[];
+            const dummyInput =
+                tf.zeros([this.maxBatchSize, battleStateEncoder.size]);
+            const dummyResult = model.predictOnBatch(dummyInput) as
+                tf.Tensor[];
             this.inUse = Promise.all(
                     dummyResult.map(r => r.data().then(() => r.dispose())))
                 .then(() => dummyInput.dispose());
@@ -132,20 +117,29 @@ class NetworkRegistry
     {
         const {port1, port2} = new MessageChannel();
         this.ports.add(port1);
+        // reply object is reused for each prediction on this port since
+        //  postMessage() copies it right away
+        const reply: PredictWorkerResult =
+        {
+            type: "predict", rid: 0, done: true, probs: new Float32Array(0),
+            value: 0
+        };
         port1.on("message", (msg: PredictMessage) =>
             this.predict(msg)
-                .then<PredictWorkerResult>(prediction =>
-                ({
-                    type: "predict", rid: msg.rid, done: true, ...prediction
-                }))
-                .catch<RawPortResultError>(err =>
-                ({
-                    type: "error", rid: msg.rid, done: true, err: serialize(err)
-                }))
-                .then(result =>
-                    port1.postMessage(result,
-                        result.type === "predict" ?
-                            [result.probs.buffer] : [result.err.buffer])));
+                .then(function(prediction)
+                {
+                    reply.rid = msg.rid;
+                    reply.probs = prediction.probs;
+                    reply.value = prediction.value;
+                    port1.postMessage(reply, [reply.probs.buffer]);
+                })
+                .catch(function(err)
+                {
+                    const errBuf = serialize(err);
+                    const result: RawPortResultError =
+                        {type: "error", rid: msg.rid, done: true, err: errBuf};
+                    port1.postMessage(result, [errBuf.buffer]);
+                }));
         // remove this port from the recorded references after close
         port1.on("close", () => this.ports.delete(port1));
         return port2;
@@ -201,40 +195,34 @@ class NetworkRegistry
      */
     private checkPredictBatch(): void
     {
-        if (this.nextBatch.length >= this.batchOptions.maxSize)
+        if (this.nextBatch.length >= this.maxBatchSize)
         {
-            // full batch
-            this.batchEvents.emit(NetworkRegistry.batchExecuteEvent);
+            // full batch, so the timer is no longer needed
+            const cancel = this.cancelTimer;
+            this.cancelTimer = null;
+            cancel?.();
+            this.executeBatch();
             return;
         }
 
-        if (this.timeoutPromise) return;
+        if (this.cancelTimer) return;
 
         // setup batch timer
-        this.timeoutPromise = new Promise<void>(res =>
-                this.cancelTimer =
-                    setTimeoutNs(res, this.batchOptions.timeoutNs))
-            .then(() =>
-            {
-                this.timeoutPromise = null;
-                this.cancelTimer = null;
-            });
-
-        // if the timer expired before the batch filled up, execute the
-        //  batch as it is
-        let didTimeout = false;
-        Promise.race(
-        [
-            this.timeoutPromise.then(() => didTimeout = true),
-            new Promise<void>(res =>
-                    this.batchEvents.prependOnceListener(
-                        NetworkRegistry.batchExecuteEvent, res))
-                .then(this.cancelTimer)
-        ])
-            .then(() =>
-                didTimeout ?
-                    this.batchEvents.emit(NetworkRegistry.batchExecuteEvent)
-                    : undefined);
+        // note: handle is declared before the callback so it's never read
+        //  before initialization, and a callback that can't match it against
+        //  the current timer is ignored
+        let cancelTimer: (() => void) | null = null;
+        const onTimeout = () =>
+        {
+            // timer was cancelled if it's no longer the current one
+            if (!cancelTimer || this.cancelTimer !== cancelTimer) return;
+            this.cancelTimer = null;
+            // timer expired before the batch filled up, so execute the batch
+            //  as it is
+            this.executeBatch();
+        };
+        cancelTimer = setTimeoutNs(onTimeout, this.batchTimeoutNs);
+        this.cancelTimer = cancelTimer;
     }
 
     /** Flushes the predict buffer and executes the batch. */
@@ -248,32 +236,40 @@ class NetworkRegistry
 
         // batch and execute model
 
-        const [batchedProbs, batchedValues] = tf.tidy(() =>
+        // copy each state straight into one input buffer rather than creating
+        //  a tensor for each state just to stack them
+        const stateSize = battleStateEncoder.size;
+        const batchStatesData = new Float32Array(batch.length * stateSize);
+        for (let i = 0; i < batch.length; ++i)
         {
-            const batchStates = tf.stack(batch.map(req => req.state));
+            batchStatesData.set(batch[i].state, i * stateSize);
+        }
+
+        // pack each entry's probs and value into one row so the whole batch's
+        //  outputs can be downloaded with a single data() call
+        const batchedOutputs = tf.tidy(() =>
+        {
+            const batchStates = tf.tensor2d(batchStatesData,
+                [batch.length, stateSize]);
             const [batchProbs, batchValues] =
                 this.model.predictOnBatch(batchStates) as tf.Tensor[];
-            return [
-                batchProbs.as2D(batch.length, intToChoice.length)
-                    .unstack<tf.Tensor1D>(),
-                batchValues.as1D()
-            ];
+            return tf.concat([batchProbs, batchValues], 1);
         });
 
         // unpack and distribute batch entries
 
-        const [probsData, valueData] = await Promise.all(
-        [
-            Promise.all(batchedProbs.map(
-                t => t.data() as Promise<Float32Array>)),
-            batchedValues.data() as Promise<Float32Array>
-        ]);
-        batchedProbs.forEach(t => t.dispose())
-        batchedValues.dispose();
+        const outputData = await batchedOutputs.data() as Float32Array;
+        batchedOutputs.dispose();
 
+        const numChoices = intToChoice.length;
+        const rowSize = numChoices + 1;
         for (let i = 0; i < batch.length; ++i)
         {
-            batch[i].res({probs: probsData[i], value: valueData[i]});
+            // copy each row's probs into its own buffer so it can be
+            //  transferred
+            const offset = i * rowSize;
+            const probs = outputData.slice(offset, offset + numChoices);
+            batch[i].res({probs, value: outputData[offset + numChoices]});
         }
     }
 }
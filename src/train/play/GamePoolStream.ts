@@ -5,8 +5,10 @@ import { GamePool, GamePoolArgs, GamePoolResult } from "./GamePool";
 /** Wraps GamePool's `#addGame()` method into a Transform stream. */
 export class GamePoolStream extends Transform
 {
-    /** Keeps track of currently running games. */
-    private readonly gamePromises = new Set<Promise<void>>();
+    /** Number of currently running games. */
+    private numPending = 0;
+    /** Callback from `#_flush()` to call once all running games finish. */
+    private flushCallback: TransformCallback | null = null;
 
     /**
      * Creates a GamePoolStream.
@@ -37,27 +39,25 @@ export class GamePoolStream extends Transform
     {
         // queue a game, passing errors and queueing the next one once a port
         //  has been assigned
-        const gamePromise = (async () =>
+        ++this.numPending;
+        (async () =>
         {
             try { this.push(await this.pool.addGame(args, callback)); }
             // generally addGame() should swallow/wrap errors, but if anything
             //  happens outside of that then the stream should crash
             catch (err) { this.emit("error", err); }
+            finally
+            {
+                if (--this.numPending <= 0) this.flushCallback?.();
+            }
         })();
-        this.gamePromises.add(gamePromise);
-
-        // cleanup after the game to keep the Set from getting too big
-        gamePromise.finally(() => this.gamePromises.delete(gamePromise));
     }
 
     /** @override */
     public _flush(callback: TransformCallback): void
     {
         // wait for all queued games to finish, then the stream can safely close
-        (async () =>
-        {
-            await Promise.allSettled(this.gamePromises);
-            callback();
-        })();
+        if (this.numPending <= 0) callback();
+        else this.flushCallback = callback;
     }
 }
@@ -47,9 +47,16 @@ export interface PlayGamesArgs
     /**
      * Function that generates valid paths to files in which to store
      * AugmentedExperiences as TFRecords (i.e., if any agent configs contain
-     * `exp=true`). If not specified, any experiences will be discarded.
+     * `exp=true`). If not specified, any experiences will be discarded. Ignored
+     * if `pool` is specified.
      */
     getExpPath?(): Promise<string>;
+    /**
+     * Thread pool to play the games on, e.g. one that was created ahead of time
+     * so its workers are already started. The caller is responsible for
+     * closing it. If not specified, a new one is created for these games.
+     */
+    readonly pool?: GamePool;
 }
 
 /**
@@ -59,7 +66,7 @@ export interface PlayGamesArgs
 export async function playGames(
     {
         processor, agentConfig, opponents, simName, maxTurns, logger, logPath,
-        rollout, getExpPath
+        rollout, getExpPath, pool: givenPool
     }:
         PlayGamesArgs): Promise<number>
 {
@@ -80,14 +87,17 @@ export async function playGames(
     {
         for (const opponent of opponents)
         {
+            // shared by every game against this opponent
+            const agents = [agentConfig, opponent.agentConfig] as const;
+            const opponentLogPath = logPath && join(logPath, opponent.name);
             for (let i = 0; i < opponent.numGames; ++i)
             {
-                const gameLogPath = logPath &&
-                    join(logPath, `${opponent.name}/game-${i + 1}`)
+                const gameLogPath = opponentLogPath &&
+                    join(opponentLogPath, `game-${i + 1}`);
                 const args: GamePoolArgs =
                 {
-                    simName, maxTurns, logPath: gameLogPath, rollout,
-                    agents: [agentConfig, opponent.agentConfig], processor
+                    simName, maxTurns, logPath: gameLogPath, rollout, agents,
+                    processor
                 }
                 yield args;
             }
@@ -125,12 +135,12 @@ export async function playGames(
     });
 
     // TODO: move pool to index.ts for reuse
-    const pool = new GamePool(getExpPath);
+    const pool = givenPool ?? new GamePool(getExpPath);
     await pipeline(
         poolArgs,
         new GamePoolStream(pool),
         processResults);
-    await pool.close();
+    if (!givenPool) await pool.close();
 
     progress.terminate();
     // TODO: also display separate records for each opponent
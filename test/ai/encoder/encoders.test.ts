@@ -1,6 +1,6 @@
 import { expect } from "chai";
 import "mocha";
-import { Encoder } from "../../../src/ai/encoder/Encoder";
+import { constant, Encoder } from "../../../src/ai/encoder/Encoder";
 import * as encoders from "../../../src/ai/encoder/encoders";
 import { limitedStatusTurns, oneHotEncoder, OneHotEncoderArgs } from
     "../../../src/ai/encoder/helpers";
@@ -87,6 +87,36 @@ describe("BattleState encoders", function()
         });
     });
 
+    describe("constant()", function()
+    {
+        it("Should encode once and copy the same output on each call",
+        function()
+        {
+            let numCalls = 0;
+            const inner: Encoder<number> =
+            {
+                encode(arr, n)
+                {
+                    ++numCalls;
+                    arr.fill(n + numCalls);
+                },
+                size: 3
+            };
+            const encoder = constant(inner, 1);
+            expect(encoder.size).to.equal(inner.size);
+            expect(numCalls).to.equal(1);
+
+            const arr1 = encoders.allocUnsafe(encoder);
+            encoder.encode(arr1, 1);
+            // shouldn't be affected by changes to a previous output
+            arr1.fill(0);
+            const arr2 = encoders.allocUnsafe(encoder);
+            encoder.encode(arr2, 1);
+            expect(arr2).to.deep.equal(new Float32Array([2, 2, 2]));
+            expect(numCalls).to.equal(1);
+        });
+    });
+
     interface CaseArgs<TState>
     {
         /** Optional name of the test case. */